@@ -2,11 +2,19 @@
 """Description: Simple way to write in Excel"""
 
 import functools
+import itertools
+import operator
 import os.path
-from decimal import Decimal
+import zipfile
+from xml.etree import ElementTree
 
 import openpyxl.utils.cell
-from pandas import ExcelWriter
+from pandas import ExcelWriter, Series
+from pandas.api.types import CategoricalDtype
+
+# C-level callables used to drop trailing zeros from formatted floats
+_strip_zeros = operator.methodcaller("rstrip", "0")
+_strip_dot = operator.methodcaller("rstrip", ".")
 
 
 def write_in_excel(df, location, sheet, index=False):
@@ -23,23 +31,21 @@ def write_in_excel(df, location, sheet, index=False):
     :param bool index: including index or not
     """
     try:
-        if not os.path.isfile(location):
+        # Replacing the only sheet of a workbook is the same as writing a new
+        # one, and xlsxwriter is much faster at that than openpyxl
+        if not os.path.isfile(location) or _is_only_sheet(location, sheet):
+            # constant_memory is not an option here: df.to_excel() writes the
+            # cells column by column, and that mode only keeps the last row
             # pylint: disable=abstract-class-instantiated
             writer = ExcelWriter(location, engine="xlsxwriter")
             df.to_excel(writer, sheet_name=sheet, index=index)
-            auto_adjust_excel_width(df, writer, sheet_name=sheet, margin=0)
             worksheet = writer.sheets[sheet]  # pull worksheet object
             worksheet.freeze_panes(1, 0)
-            for idx, col in enumerate(df):  # loop through all columns
-                series = df[col]
-                max_len = (
-                    max((
-                        series.astype(str).map(
-                            len).max(),  # len of largest item
-                        len(str(series.name)),  # len of column name/header
-                    )) + 1)  # adding a little extra space
-                max_len = min(max_len, 50)
-                worksheet.set_column(idx, idx, max_len)  # set column width
+            auto_adjust_excel_width(df,
+                                    writer,
+                                    sheet_name=sheet,
+                                    margin=0,
+                                    index=index)
             writer.close()
         else:
             # pylint: disable=abstract-class-instantiated
@@ -48,7 +54,11 @@ def write_in_excel(df, location, sheet, index=False):
                              engine="openpyxl",
                              if_sheet_exists="replace") as writer:
                 df.to_excel(writer, sheet_name=sheet, index=index)
-                auto_adjust_excel_width(df, writer, sheet_name=sheet, margin=0)
+                auto_adjust_excel_width(df,
+                                        writer,
+                                        sheet_name=sheet,
+                                        margin=0,
+                                        index=index)
 
     except PermissionError:
         # Helps in case if the Excel is already in access mode somewhere else
@@ -57,6 +67,29 @@ def write_in_excel(df, location, sheet, index=False):
         print(e)
 
 
+def _is_only_sheet(location, sheet):
+    """
+    Checks whether the given sheet is the only one in an existing Excel file,
+    anything that cannot be read as such counts as no
+
+    :param str location: Location of the existing file
+    :param str sheet: The name of the sheet
+    """
+    # Only read the workbook part: opening the file with openpyxl, even in
+    # read_only mode, also parses the shared strings and the styles
+    try:
+        with zipfile.ZipFile(location) as archive:
+            workbook = ElementTree.fromstring(archive.read("xl/workbook.xml"))
+    except (KeyError, zipfile.BadZipFile):
+        # Not where xlsxwriter and openpyxl put it: leave it to openpyxl
+        return False
+    sheet_names = [
+        element.get("name") for element in workbook.iter()
+        if element.tag.rpartition("}")[2] == "sheet"
+    ]
+    return sheet_names == [sheet]
+
+
 def find_length(text):
     """
     Get the effective text length in characters, taking into account newlines
@@ -85,18 +118,115 @@ def find_float_length(v, decimals=3):
     :param int decimals: The amount of decimal points
     """
     if isinstance(v, float):  # Round to [decimal] places
-        return str(
-            Decimal(v).quantize(Decimal("1." + "0" * decimals)).normalize())
+        text = _float_format(decimals)(v)
+        if decimals > 0:  # Drop trailing zeros like Decimal.normalize()
+            text = _strip_dot(_strip_zeros(text))
+        return text
     return str(v)
 
 
+@functools.lru_cache(maxsize=None)
+def _float_format(decimals):
+    """
+    Cached formatter that renders a float with a fixed amount of decimal points
+
+    How to use:
+    ```
+    _float_format(decimals)(v)
+    ```
+    :param int decimals: The amount of decimal points
+    """
+    return f"{{:.{decimals}f}}".format
+
+
+def find_series_length(series, decimals=3):
+    """
+    Vectorized find_length over a whole pandas Series, taking into account newlines
+
+    How to use:
+    ```
+    find_series_length(series, decimals)
+    ```
+    :param Series series: The values we will check the length for
+    :param int decimals: The amount of decimal points kept for floats
+    """
+    if series.empty:
+        return 0
+    if series.dtype.kind in "biu":
+        # Integers only get wider with their magnitude: probe the extremes.
+        # Nullable Int64/boolean columns may hold missing values: skip them
+        numbers = series.dropna()
+        if numbers.empty:
+            return 0
+        extremes = (numbers.min(), numbers.max())
+        return max(map(len, map(str, extremes)))
+    if series.dtype.kind == "f":
+        numbers = series.dropna()
+        if not numbers.empty and numbers.mod(1).eq(0).all():
+            # Whole floats (e.g. integers with gaps) lose all their decimals
+            # once the trailing zeros are dropped, so they act like integers
+            to_str = _float_format(0)
+            extremes = (numbers.min(), numbers.max())
+            return max(map(len, map(to_str, extremes)))
+    # Repeated values share the same length, so only measure each one once
+    if isinstance(series.dtype, CategoricalDtype):
+        categories = series.cat.remove_unused_categories().cat.categories
+        series = categories.to_series()
+    else:
+        try:
+            series = Series(series.unique(), dtype=series.dtype)
+        except TypeError:  # Unhashable values such as lists
+            pass
+    # Missing values are written as empty cells, so they take no space. The
+    # values are formatted lazily: only their lengths are kept around
+    is_float = series.dtype.kind == "f"
+    values = series.dropna().tolist()
+    # Peak memory stays near the size of the column's strings: _max_line_len
+    # measures them in place, and this only drops an array of references
+    del series
+    if is_float:  # Round to [decimal] places
+        texts = map(_float_format(decimals), values)
+        if decimals > 0:
+            texts = map(_strip_dot, map(_strip_zeros, texts))
+        return max(map(len, texts), default=0)
+    to_str = str
+    if any(map(isinstance, values, itertools.repeat(float))):
+        # Floats mixed into other values are still rounded to [decimal] places
+        to_str = functools.partial(find_float_length, decimals=decimals)
+    return _max_line_len(list(map(to_str, values)))
+
+
+def _max_line_len(values):
+    """
+    Length of the longest line in a list of strings, without copying them:
+    only the values that contain a newline are split
+
+    :param list values: The strings we are checking the length for
+    """
+    newlines = itertools.repeat("\n")
+    if not any(map(operator.contains, values, newlines)):
+        return max(map(len, values), default=0)
+    multiline = list(map(operator.contains, values, newlines))
+    single_line = itertools.compress(values, map(operator.not_, multiline))
+    return max(
+        itertools.chain(
+            map(len, single_line),
+            map(find_length, itertools.compress(values, multiline)),
+        ),
+        default=0,
+    )
+
+
 def auto_adjust_excel_width(df,
                             writer,
                             sheet_name,
                             margin=3,
                             length_factor=1.0,
                             decimals=3,
-                            index=True):
+                            index=True,
+                            max_width=50,
+                            precomputed_widths=None,
+                            widths=None):
     """
     Auto adjust column width to fit content in a XLSX exported from a pandas DataFrame.
 
@@ -118,44 +248,88 @@ def auto_adjust_excel_width(df,
     :param bool index: Whether the DataFrame's index is inserted as a separate column
     (if index=False in df.to_xlsx()
     set index=False here!)
+    :param int max_width: The maximum number of characters a column is sized for,
+    longer values are cut off visually (None for no limit)
+    :param dict precomputed_widths: Known lengths in characters by column name, these
+    columns are not measured again but still get length_factor, margin and max_width
+    applied (unlike widths)
+    :param dict widths: Final column widths by column name, used as they are without
+    length_factor, margin or max_width (unlike precomputed_widths): when given,
+    nothing is measured and only these columns are set, the index column keeps
+    its current width
     """
     writer_type = type(
         writer.book
     ).__module__  # e.g. 'xlsxwriter.workbook' or 'openpyxl.workbook.workbook'
     is_openpyxl = writer_type.startswith("openpyxl")
     is_xlsxwriter = writer_type.startswith("xlsxwriter")
-    to_str = functools.partial(find_float_length, decimals=decimals)
-    # str() but rounds decimals to predefined length
     if not is_openpyxl and not is_xlsxwriter:
         raise ValueError(
             "Only openpyxl and xlsxwriter are supported as backends, not " +
             writer_type)
     sheet = writer.sheets[sheet_name]
-    # Compute & set column width for each column
-    for column_name in df.columns:
-        # Convert the value of the columns to string and select the
-        column_length = max(
-            df[column_name].apply(to_str).map(find_length).max(),
-            find_length(column_name),
-        )
-        # Get index of column in Excel
-        # Column index is +1 if we also export the index column
-        col_idx = df.columns.get_loc(column_name)
-        if index:
-            col_idx += 1
+    # Resolve the backend once instead of branching for every column
+    if is_openpyxl:
+        dimensions = sheet.column_dimensions
+        # One letter per exported column, including the index column
+        get_column_letter = openpyxl.utils.cell.get_column_letter
+        letters = list(map(get_column_letter, range(1, len(df.columns) + 2)))
+
+        def set_width(col_idx, width):
+            dimensions[letters[col_idx]].width = width
+
+    else:
+
+        def set_width(col_idx, width):
+            sheet.set_column(col_idx, col_idx, width)
+
+    if widths is not None:  # Nothing to measure, just set the known widths
+        # Every position of a label: duplicated labels all get the width
+        positions = {}
+        for col_idx, column_name in enumerate(df.columns,
+                                              start=1 if index else 0):
+            positions.setdefault(column_name, []).append(col_idx)
+        for column_name, width in widths.items():
+            if column_name not in positions:
+                raise ValueError(f"Column {column_name!r} from widths is not "
+                                 "in the DataFrame")
+            for col_idx in positions[column_name]:
+                set_width(col_idx, width)
+        return
+    measure = functools.partial(find_series_length, decimals=decimals)
+    if precomputed_widths is None:
+        precomputed_widths = {}
+    for column_name in precomputed_widths:
+        if column_name not in df.columns:
+            raise ValueError(f"Column {column_name!r} from precomputed_widths "
+                             "is not in the DataFrame")
+    # Positional access: no label lookup, and duplicated labels stay apart
+    columns = [
+        series for column_name, series in df.items()
+        if column_name not in precomputed_widths
+    ]
+    value_lengths = map(measure, columns)
+    # A precomputed length already accounts for the header of its column
+    column_lengths = [
+        precomputed_widths[column_name] if column_name in precomputed_widths
+        else max(next(value_lengths), find_length(str(column_name)))
+        for column_name in df.columns
+    ]
+    if max_width is not None:
+        column_lengths = [min(length, max_width) for length in column_lengths]
+    # Set column width for each column
+    # Column index is +1 if we also export the index column
+    for col_idx, column_length in enumerate(column_lengths,
+                                            start=1 if index else 0):
         # Set width of column to (column_length + margin)
-        if is_openpyxl:
-            sheet.column_dimensions[openpyxl.utils.cell.get_column_letter(
-                col_idx + 1)].width = (column_length * length_factor + margin)
-        else:
-            sheet.set_column(col_idx, col_idx,
-                             column_length * length_factor + margin)
+        set_width(col_idx, column_length * length_factor + margin)
     if index:  # If the index column is being exported
+        # Like the headers, a non-string index name is written as str()
+        index_name = df.index.name
         index_length = max(
-            df.index.map(to_str).map(find_length).max(),
-            find_length(df.index.name))
-        if is_openpyxl:
-            sheet.column_dimensions[
-                "A"].width = index_length * length_factor + margin
-        else:
-            sheet.set_column(0, 0, index_length * length_factor + margin)
+            find_series_length(df.index.to_series(), decimals=decimals),
+            0 if index_name is None else find_length(str(index_name)),
+        )
+        if max_width is not None:
+            index_length = min(index_length, max_width)
+        set_width(0, index_length * length_factor + margin)
@@ -0,0 +1,124 @@
+"""Round-trip tests for write_in_excel and auto_adjust_excel_width"""
+
+import io
+
+import numpy as np
+import openpyxl
+import pandas as pd
+import pytest
+
+from excel_write import auto_adjust_excel_width, write_in_excel
+
+
+def column_widths(location, sheet):
+    """Column widths by letter, without the padding xlsxwriter adds"""
+    worksheet = openpyxl.load_workbook(location)[sheet]
+    return {
+        letter: int(dimension.width)
+        for letter, dimension in worksheet.column_dimensions.items()
+    }
+
+
+def adjusted_widths(df, index=False, **kwargs):
+    """Widths set by auto_adjust_excel_width on an in-memory openpyxl sheet"""
+    with pd.ExcelWriter(io.BytesIO(), engine="openpyxl") as writer:
+        df.to_excel(writer, sheet_name="Sheet", index=index)
+        auto_adjust_excel_width(df,
+                                writer,
+                                sheet_name="Sheet",
+                                margin=0,
+                                index=index,
+                                **kwargs)
+        dimensions = writer.sheets["Sheet"].column_dimensions
+        return {letter: dimensions[letter].width for letter in dimensions}
+
+
+@pytest.fixture
+def df():
+    return pd.DataFrame({
+        "id": [1, 22, 333],
+        "name": ["a", "bbbbbbbbbb", "cc"],
+    })
+
+
+def test_write_new_file(tmp_path, df):
+    location = tmp_path / "book.xlsx"
+    write_in_excel(df, location, "one")
+
+    pd.testing.assert_frame_equal(pd.read_excel(location, sheet_name="one"),
+                                  df)
+    assert column_widths(location, "one") == {"A": 3, "B": 10}
+    assert openpyxl.load_workbook(location)["one"].freeze_panes == "A2"
+
+
+def test_rewrite_only_sheet(tmp_path, df):
+    location = tmp_path / "book.xlsx"
+    write_in_excel(df, location, "one")
+    write_in_excel(df.head(1), location, "one")
+
+    sheets = pd.read_excel(location, sheet_name=None)
+    assert list(sheets) == ["one"]
+    pd.testing.assert_frame_equal(sheets["one"], df.head(1))
+    assert column_widths(location, "one") == {"A": 2, "B": 4}
+    # Rewritten from scratch through xlsxwriter, so the panes are frozen
+    assert openpyxl.load_workbook(location)["one"].freeze_panes == "A2"
+
+
+def test_append_next_to_other_sheet(tmp_path, df):
+    location = tmp_path / "book.xlsx"
+    write_in_excel(df, location, "one")
+    write_in_excel(df.head(2), location, "two")
+    write_in_excel(df.tail(1), location, "two")
+
+    sheets = pd.read_excel(location, sheet_name=None)
+    assert list(sheets) == ["one", "two"]
+    pd.testing.assert_frame_equal(sheets["one"], df)
+    pd.testing.assert_frame_equal(sheets["two"],
+                                  df.tail(1).reset_index(drop=True))
+    assert column_widths(location, "two") == {"A": 3, "B": 4}
+
+
+def test_missing_values_take_no_space():
+    df = pd.DataFrame({
+        "f": [np.nan, 1.5],
+        "o": pd.Series([None, "abc"], dtype=object),
+        "i": pd.Series([pd.NA, pd.NA], dtype="Int64"),
+    })
+    assert adjusted_widths(df) == {"A": 3, "B": 3, "C": 1}
+
+
+def test_floats_in_object_column_are_rounded():
+    df = pd.DataFrame({"a": ["n/a", 0.123456789123, 3.5]}, dtype=object)
+    assert adjusted_widths(df) == {"A": 5}
+    assert adjusted_widths(df, decimals=1) == {"A": 3}
+
+
+def test_max_width_caps_long_values():
+    df = pd.DataFrame({"a": ["x" * 80]})
+    assert adjusted_widths(df) == {"A": 50}
+    assert adjusted_widths(df, max_width=None) == {"A": 80}
+
+
+def test_precomputed_widths_skip_measuring():
+    df = pd.DataFrame({"a": ["xxxxxxxx"], "b": ["y"]})
+    widths = adjusted_widths(df, precomputed_widths={"b": 30})
+    assert widths == {"A": 8, "B": 30}
+    # Character lengths still go through length_factor and max_width
+    widths = adjusted_widths(df,
+                             precomputed_widths={"b": 60},
+                             length_factor=2.0)
+    assert widths == {"A": 16, "B": 100}
+
+
+def test_widths_are_set_as_given():
+    df = pd.DataFrame([["a", "b", "c"]], columns=["x", "y", "x"])
+    assert adjusted_widths(df, widths={"x": 70}) == {"A": 70, "C": 70}
+    # The index column is left alone, data columns move one to the right
+    assert adjusted_widths(df, index=True, widths={"y": 7}) == {"C": 7}
+
+
+@pytest.mark.parametrize("argument", ["widths", "precomputed_widths"])
+def test_unknown_column_is_rejected(argument):
+    df = pd.DataFrame({"a": [1]})
+    with pytest.raises(ValueError, match="'zz'"):
+        adjusted_widths(df, **{argument: {"zz": 10}})